@@ -6,11 +6,17 @@ Prevents spam by detecting and suppressing duplicate alerts.
 
 import sys
 import json
+import contextlib
+import fcntl
 import hashlib
+import math
+import mmap
 import os
+import re
+import struct
+import tempfile
 import time
 import logging
-from pathlib import Path
 from typing import Dict, Any, Optional
 
 logging.basicConfig(level=logging.INFO)
@@ -20,123 +26,376 @@ logger = logging.getLogger(__name__)
 CACHE_DIR = os.environ.get('ALERT_CACHE_DIR', '/tmp/buntspecht-alerts')
 CACHE_DURATION = int(os.environ.get('ALERT_CACHE_DURATION', '3600'))  # 1 hour default
 SIMILARITY_THRESHOLD = float(os.environ.get('ALERT_SIMILARITY_THRESHOLD', '0.8'))
+BLOOM_CAPACITY = int(os.environ.get('ALERT_BLOOM_CAPACITY', '100000'))
+BLOOM_ERROR_RATE = float(os.environ.get('ALERT_BLOOM_ERROR_RATE', '0.0001'))
+CACHE_SLOTS = int(os.environ.get('ALERT_CACHE_SLOTS', '131072'))
+
+# Patterns for message normalization
+_TIMESTAMP_RE = re.compile(r'\d{4}-\d{2}-\d{2}[T\s]\d{2}:\d{2}:\d{2}')
+_TIME_RE = re.compile(r'\d{2}:\d{2}:\d{2}')
+_PERCENTAGE_RE = re.compile(r'\b\d+\.\d+%')
+_SIZE_RE = re.compile(r'\b\d+\s*(MB|GB|KB|bytes?)')
+_DURATION_RE = re.compile(r'\b\d+\s*ms')
+_IP_RE = re.compile(r'\b\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}(:\d+)?\b')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Patterns for parsing plain text alerts
+_SERVICE_RE = re.compile(r'service[:\s]+([^\n\r]+)', re.IGNORECASE)
+_SEVERITY_RE = re.compile(r'severity[:\s]+(\w+)', re.IGNORECASE)
+_SEVERITY_WORD_RE = re.compile(r'\b(critical|high|medium|low)\b', re.IGNORECASE)
+
+# Suppression rules. 'testing' is covered by the 'test' substring.
+_LOW_SEVERITIES = frozenset(('low', 'info'))
+_TEST_RE = re.compile(r'test|demo')
+
+def _advise_random(mm: mmap.mmap):
+    """Hint that lookups hit scattered pages, so faults skip the readahead."""
+    if hasattr(mmap, 'MADV_RANDOM'):
+        mm.madvise(mmap.MADV_RANDOM)
+
+def _is_replaced(path: str, inode: int) -> bool:
+    """Check whether the file mapped from path was since replaced or removed."""
+    try:
+        return os.stat(path).st_ino != inode
+    except FileNotFoundError:
+        return True
+
+class BloomFilter:
+    """
+    Bloom filter stored in a memory-mapped file.
+
+    The file starts with the creation time of the filter, followed by the
+    bit array. Membership tests only touch the mapped pages.
+    """
+
+    HEADER = struct.Struct('<d')
+
+    def __init__(self, path: str, capacity: int, error_rate: float):
+        # Optimal size and hash count for the expected number of entries
+        self.num_bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        size = self.HEADER.size + (self.num_bits + 7) // 8
+
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fresh = os.fstat(fd).st_size != size
+            if fresh:
+                # New file or one sized for other settings, start empty
+                os.ftruncate(fd, 0)
+                os.ftruncate(fd, size)
+            self._mm = mmap.mmap(fd, size)
+            self.inode = os.fstat(fd).st_ino
+        finally:
+            os.close(fd)
+        _advise_random(self._mm)
+
+        if fresh:
+            self.HEADER.pack_into(self._mm, 0, time.time())
+        self.created = self.HEADER.unpack_from(self._mm, 0)[0]
+
+    def _bit_positions(self, alert_hash: str):
+        # Double hashing: derive all k positions from two 64-bit slices of the digest
+        h1, h2 = struct.unpack_from('<QQ', bytes.fromhex(alert_hash))
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def __contains__(self, alert_hash: str) -> bool:
+        mm = self._mm
+        offset = self.HEADER.size
+        for bit in self._bit_positions(alert_hash):
+            if not mm[offset + (bit >> 3)] & (1 << (bit & 7)):
+                return False
+        return True
+
+    def add(self, alert_hash: str):
+        mm = self._mm
+        offset = self.HEADER.size
+        for bit in self._bit_positions(alert_hash):
+            mm[offset + (bit >> 3)] |= 1 << (bit & 7)
+
+    def close(self):
+        self._mm.close()
+
+class AlertFilter:
+    """
+    Pair of Bloom filters answering "possibly cached" for alert hashes.
+
+    New alerts go into the current filter, lookups check both. The filters
+    are rotated once the current one is CACHE_DURATION old, so every alert
+    cached within the last CACHE_DURATION is still covered.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.current_path = os.path.join(cache_dir, 'alerts.bloom')
+        self.previous_path = os.path.join(cache_dir, 'alerts.bloom.prev')
+        self.current = self._open(self.current_path)
+        self.previous = self._open(self.previous_path)
+
+    @staticmethod
+    def _open(path: str) -> BloomFilter:
+        return BloomFilter(path, BLOOM_CAPACITY, BLOOM_ERROR_RATE)
+
+    def __contains__(self, alert_hash: str) -> bool:
+        return alert_hash in self.current or alert_hash in self.previous
+
+    def add(self, alert_hash: str):
+        self.current.add(alert_hash)
+
+    def refresh(self):
+        """Reopen filters another process has rotated since they were mapped."""
+        if _is_replaced(self.current_path, self.current.inode):
+            self.current.close()
+            self.current = self._open(self.current_path)
+        if _is_replaced(self.previous_path, self.previous.inode):
+            self.previous.close()
+            self.previous = self._open(self.previous_path)
+
+    def rotate_if_due(self) -> bool:
+        """Start a new generation if the current filter has expired."""
+        # Another process may have rotated already, go by the files on disk
+        self.refresh()
+        if time.time() - self.current.created < CACHE_DURATION:
+            return False
+
+        self.current.close()
+        self.previous.close()
+        os.replace(self.current_path, self.previous_path)
+        self.previous = self._open(self.previous_path)
+        self.current = self._open(self.current_path)
+        return True
+
+_alert_filter: Optional[AlertFilter] = None
+
+def get_alert_filter() -> AlertFilter:
+    """Open the alert filter on first use."""
+    global _alert_filter
+    if _alert_filter is None:
+        _alert_filter = AlertFilter(CACHE_DIR)
+    else:
+        _alert_filter.refresh()
+    return _alert_filter
+
+class AlertCache:
+    """
+    Hash table of alert records stored in a memory-mapped file.
+
+    Every slot holds the alert digest, the time it was first seen and how
+    often it was seen, a count of 0 marks an empty slot. Slots are found by
+    linear probing from the first 8 bytes of the digest, limited to
+    MAX_PROBES slots so a lookup never walks the whole table.
+    """
+
+    RECORD = struct.Struct('<32sII')
+    MAX_PROBES = 32
+
+    def __init__(self, path: str, slots: int):
+        self.path = path
+        self.slots = slots
+        self._map()
+
+    def _map(self):
+        size = self.slots * self.RECORD.size
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size != size:
+                # New file or one sized for other settings, start empty
+                os.ftruncate(fd, 0)
+                os.ftruncate(fd, size)
+            self._mm = mmap.mmap(fd, size)
+            self.inode = os.fstat(fd).st_ino
+        finally:
+            os.close(fd)
+        _advise_random(self._mm)
+
+    def refresh(self):
+        """Remap the table if another process has compacted it since it was mapped."""
+        if _is_replaced(self.path, self.inode):
+            self._mm.close()
+            self._map()
+
+    def _find_slot(self, table, digest: bytes, now: int) -> int:
+        """Return the offset of the digest's record, or of the slot to store it in."""
+        record = self.RECORD
+        start = int.from_bytes(digest[:8], 'little')
+        reusable = None
+        oldest = None
+        
+        for i in range(min(self.MAX_PROBES, self.slots)):
+            offset = (start + i) % self.slots * record.size
+            key, timestamp, count = record.unpack_from(table, offset)
+            if not count or key == digest:
+                return offset
+            if reusable is None and now - timestamp > CACHE_DURATION:
+                reusable = offset
+            if oldest is None or timestamp < oldest[0]:
+                oldest = (timestamp, offset)
+        
+        # No free slot in reach, reuse an expired one or evict the oldest
+        return reusable if reusable is not None else oldest[1]
+
+    def hit(self, digest: bytes) -> int:
+        """Count another occurrence of a cached alert, returns 0 if it isn't cached."""
+        now = int(time.time())
+        offset = self._find_slot(self._mm, digest, now)
+        key, timestamp, count = self.RECORD.unpack_from(self._mm, offset)
+        if not count or key != digest or now - timestamp > CACHE_DURATION:
+            return 0
+        
+        self.RECORD.pack_into(self._mm, offset, digest, timestamp, count + 1)
+        return count + 1
+
+    def add(self, digest: bytes):
+        """Cache an alert as first seen now."""
+        now = int(time.time())
+        self.RECORD.pack_into(self._mm, self._find_slot(self._mm, digest, now), digest, now, 1)
+
+    def compact(self) -> int:
+        """Rewrite the table without expired records, returns how many were dropped."""
+        now = int(time.time())
+        table = bytearray(len(self._mm))
+        removed = 0
+        
+        for digest, timestamp, count in self.RECORD.iter_unpack(self._mm):
+            if not count:
+                continue
+            if now - timestamp > CACHE_DURATION:
+                removed += 1
+                continue
+            self.RECORD.pack_into(table, self._find_slot(table, digest, now), digest, timestamp, count)
+        
+        # Build the new table in a swap file of its own and move it into place
+        fd, swap_path = tempfile.mkstemp(prefix='alerts.cache.', dir=os.path.dirname(self.path))
+        try:
+            # A file object retries short writes, the swap file is only moved
+            # into place once the whole table is written
+            with os.fdopen(fd, 'wb') as swap_file:
+                os.fchmod(fd, 0o644)
+                swap_file.write(table)
+            os.replace(swap_path, self.path)
+        except OSError:
+            os.unlink(swap_path)
+            raise
+        
+        self._mm.close()
+        self._map()
+        return removed
+
+_alert_cache: Optional[AlertCache] = None
+
+def get_alert_cache() -> AlertCache:
+    """Open the alert cache on first use."""
+    global _alert_cache
+    if _alert_cache is None:
+        _alert_cache = AlertCache(os.path.join(CACHE_DIR, 'alerts.cache'), CACHE_SLOTS)
+    else:
+        _alert_cache.refresh()
+    return _alert_cache
+
+_lock_fd: Optional[int] = None
+
+@contextlib.contextmanager
+def cache_lock():
+    """
+    Hold an exclusive lock on the cache directory.
+
+    Several processes can share CACHE_DIR, every access to the mapped files
+    happens under this lock so that bit updates and record writes aren't
+    lost and files are only rotated or rewritten by one process at a time.
+    """
+    global _lock_fd
+    if _lock_fd is None:
+        _lock_fd = os.open(os.path.join(CACHE_DIR, 'alerts.lock'), os.O_RDWR | os.O_CREAT, 0o644)
+    fcntl.flock(_lock_fd, fcntl.LOCK_EX)
+    try:
+        yield
+    finally:
+        fcntl.flock(_lock_fd, fcntl.LOCK_UN)
 
 def setup_cache_dir():
     """Ensure cache directory exists."""
-    Path(CACHE_DIR).mkdir(parents=True, exist_ok=True)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+
+def alert_hash_key(alert_data: Dict[str, Any]) -> bytes:
+    """Build the canonical byte string that identifies an alert."""
+    
+    # Key fields for hashing, in a fixed order
+    service = str(alert_data.get('service', ''))
+    severity = str(alert_data.get('severity', ''))
+    message = normalize_message(alert_data.get('message', ''))
+    alert_type = str(alert_data.get('type', ''))
+    
+    # Length prefixes keep the encoding unambiguous without any quoting
+    return (f'{len(service)}:{service}{len(severity)}:{severity}'
+            f'{len(message)}:{message}{len(alert_type)}:{alert_type}').encode()
 
 def generate_alert_hash(alert_data: Dict[str, Any]) -> str:
     """Generate a hash for alert deduplication."""
     
-    # Extract key fields for hashing
-    key_fields = {
-        'service': alert_data.get('service', ''),
-        'severity': alert_data.get('severity', ''),
-        'message': normalize_message(alert_data.get('message', '')),
-        'alert_type': alert_data.get('type', ''),
-    }
-    
-    # Create a stable hash
-    content = json.dumps(key_fields, sort_keys=True)
-    return hashlib.sha256(content.encode()).hexdigest()
+    # The hash only identifies alerts, so skip the FIPS-restricted code path
+    return hashlib.sha256(alert_hash_key(alert_data), usedforsecurity=False).hexdigest()
 
 def normalize_message(message: str) -> str:
     """Normalize alert message for better deduplication."""
     
     # Remove timestamps
-    import re
-    message = re.sub(r'\d{4}-\d{2}-\d{2}[T\s]\d{2}:\d{2}:\d{2}', '[TIMESTAMP]', message)
-    message = re.sub(r'\d{2}:\d{2}:\d{2}', '[TIME]', message)
+    message = _TIMESTAMP_RE.sub('[TIMESTAMP]', message)
+    message = _TIME_RE.sub('[TIME]', message)
     
     # Remove specific numbers that might vary
-    message = re.sub(r'\b\d+\.\d+%', '[PERCENTAGE]', message)
-    message = re.sub(r'\b\d+\s*(MB|GB|KB|bytes?)', '[SIZE]', message)
-    message = re.sub(r'\b\d+\s*ms', '[DURATION]', message)
+    message = _PERCENTAGE_RE.sub('[PERCENTAGE]', message)
+    message = _SIZE_RE.sub('[SIZE]', message)
+    message = _DURATION_RE.sub('[DURATION]', message)
     
     # Remove IP addresses and ports
-    message = re.sub(r'\b\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}(:\d+)?\b', '[IP]', message)
+    message = _IP_RE.sub('[IP]', message)
     
     # Normalize whitespace
-    message = re.sub(r'\s+', ' ', message).strip()
+    message = _WHITESPACE_RE.sub(' ', message).strip()
     
     return message.lower()
 
 def is_duplicate_alert(alert_hash: str) -> bool:
     """Check if alert is a duplicate based on cache."""
     
-    cache_file = Path(CACHE_DIR) / f"{alert_hash}.json"
-    
-    if not cache_file.exists():
-        return False
-    
     try:
-        with open(cache_file, 'r') as f:
-            cache_data = json.load(f)
-        
-        # Check if cache entry is still valid
-        if time.time() - cache_data['timestamp'] > CACHE_DURATION:
-            # Cache expired, remove it
-            cache_file.unlink()
-            return False
-        
-        # Update last seen time
-        cache_data['last_seen'] = time.time()
-        cache_data['count'] += 1
-        
-        with open(cache_file, 'w') as f:
-            json.dump(cache_data, f)
-        
-        logger.info(f"Duplicate alert detected (seen {cache_data['count']} times)")
-        return True
-        
+        with cache_lock():
+            # Alerts missing from the filter were never cached, skip the table lookup
+            if alert_hash not in get_alert_filter():
+                return False
+            
+            count = get_alert_cache().hit(bytes.fromhex(alert_hash))
     except Exception as e:
-        logger.error(f"Error reading cache file {cache_file}: {e}")
+        logger.error(f"Error reading alert cache: {e}")
         return False
-
-def cache_alert(alert_hash: str, alert_data: Dict[str, Any]):
-    """Cache alert to prevent future duplicates."""
     
-    cache_file = Path(CACHE_DIR) / f"{alert_hash}.json"
+    if not count:
+        return False
     
-    cache_data = {
-        'timestamp': time.time(),
-        'last_seen': time.time(),
-        'count': 1,
-        'alert_data': alert_data
-    }
+    logger.info(f"Duplicate alert detected (seen {count} times)")
+    return True
+
+def cache_alert(alert_hash: str):
+    """Cache alert to prevent future duplicates."""
     
     try:
-        with open(cache_file, 'w') as f:
-            json.dump(cache_data, f)
+        with cache_lock():
+            get_alert_cache().add(bytes.fromhex(alert_hash))
+            get_alert_filter().add(alert_hash)
         logger.debug(f"Cached alert with hash {alert_hash}")
     except Exception as e:
-        logger.error(f"Error writing cache file {cache_file}: {e}")
+        logger.error(f"Error writing alert cache: {e}")
 
 def cleanup_expired_cache():
-    """Remove expired cache entries."""
+    """Rotate the alert filter and remove expired cache entries."""
     
     try:
-        cache_dir = Path(CACHE_DIR)
-        if not cache_dir.exists():
-            return
-        
-        current_time = time.time()
-        removed_count = 0
-        
-        for cache_file in cache_dir.glob("*.json"):
-            try:
-                with open(cache_file, 'r') as f:
-                    cache_data = json.load(f)
-                
-                if current_time - cache_data['timestamp'] > CACHE_DURATION:
-                    cache_file.unlink()
-                    removed_count += 1
-                    
-            except Exception as e:
-                logger.warning(f"Error processing cache file {cache_file}: {e}")
-                # Remove corrupted cache files
-                cache_file.unlink()
-                removed_count += 1
+        with cache_lock():
+            # Compacting the cache once per filter generation is enough, expired
+            # entries are also ignored when they are looked up
+            if not get_alert_filter().rotate_if_due():
+                return
+            
+            removed_count = get_alert_cache().compact()
         
         if removed_count > 0:
             logger.info(f"Cleaned up {removed_count} expired cache entries")
@@ -147,42 +406,38 @@ def cleanup_expired_cache():
 def parse_alert_content(content: str) -> Optional[Dict[str, Any]]:
     """Parse alert content from various formats."""
     
-    try:
-        # Try JSON first
-        return json.loads(content)
-    except json.JSONDecodeError:
-        pass
+    # Try JSON first, plain text alerts skip the failing parse
+    if content.startswith('{'):
+        try:
+            return json.loads(content)
+        except json.JSONDecodeError:
+            pass
     
     # Try to extract structured data from text
     alert_data = {}
     
-    # Extract common patterns
-    import re
-    
     # Service name
-    service_match = re.search(r'service[:\s]+([^\n\r]+)', content, re.IGNORECASE)
+    service_match = _SERVICE_RE.search(content)
     if service_match:
         alert_data['service'] = service_match.group(1).strip()
     
     # Severity
-    severity_match = re.search(r'severity[:\s]+(\w+)', content, re.IGNORECASE)
+    severity_match = _SEVERITY_RE.search(content) or _SEVERITY_WORD_RE.search(content)
     if severity_match:
         alert_data['severity'] = severity_match.group(1).strip()
-    elif re.search(r'\b(critical|high|medium|low)\b', content, re.IGNORECASE):
-        severity_match = re.search(r'\b(critical|high|medium|low)\b', content, re.IGNORECASE)
-        alert_data['severity'] = severity_match.group(1)
     
     # Message (use the whole content if no specific message found)
     alert_data['message'] = content
     
     # Alert type
-    if 'cpu' in content.lower():
+    content_lower = content.lower()
+    if 'cpu' in content_lower:
         alert_data['type'] = 'cpu'
-    elif 'memory' in content.lower():
+    elif 'memory' in content_lower:
         alert_data['type'] = 'memory'
-    elif 'disk' in content.lower():
+    elif 'disk' in content_lower:
         alert_data['type'] = 'disk'
-    elif 'network' in content.lower():
+    elif 'network' in content_lower:
         alert_data['type'] = 'network'
     else:
         alert_data['type'] = 'general'
@@ -200,32 +455,62 @@ def should_suppress_alert(alert_data: Dict[str, Any]) -> tuple[bool, str]:
         return True, f"Duplicate alert (hash: {alert_hash[:8]})"
     
     # Cache this alert for future deduplication
-    cache_alert(alert_hash, alert_data)
+    cache_alert(alert_hash)
     
     # Additional suppression rules
     severity = alert_data.get('severity', '').lower()
     message = alert_data.get('message', '').lower()
     
     # Suppress low severity alerts during business hours
-    if severity in ['low', 'info']:
+    if severity in _LOW_SEVERITIES:
         current_hour = time.localtime().tm_hour
         if 9 <= current_hour <= 17:  # Business hours
             return True, "Low severity alert during business hours"
     
     # Suppress test alerts
-    if any(keyword in message for keyword in ['test', 'testing', 'demo']):
+    if _TEST_RE.search(message):
         return True, "Test alert detected"
     
     return False, ""
 
+def serve():
+    """
+    Answer one alert per input line until stdin is closed.
+
+    Every line holds an alert in any single-line format the one-shot mode
+    accepts. For each line a JSON object with "suppress" and "reason" is
+    written to stdout, so a caller can keep one process (and its open
+    cache) around instead of starting the interpreter for every alert.
+    """
+    for line in sys.stdin.buffer:
+        try:
+            cleanup_expired_cache()
+            content = line.decode('utf-8', 'replace').strip()
+            alert_data = parse_alert_content(content) if content else None
+            if alert_data:
+                suppress, reason = should_suppress_alert(alert_data)
+            else:
+                suppress, reason = True, "Could not parse alert content"
+        except Exception as e:
+            logger.error(f"Alert processing failed: {e}")
+            suppress, reason = True, f"Alert processing failed: {e}"
+        
+        sys.stdout.write(json.dumps({'suppress': suppress, 'reason': reason}) + '\n')
+        sys.stdout.flush()
+
 if __name__ == "__main__":
+    if '--serve' in sys.argv[1:]:
+        setup_cache_dir()
+        serve()
+        sys.exit(0)
+    
     try:
         # Setup
         setup_cache_dir()
         cleanup_expired_cache()
         
         # Read input
-        content = sys.stdin.read().strip()
+        content = sys.stdin.buffer.read().decode('utf-8', 'replace').strip()
         if not content:
             logger.error("No input content provided")
             sys.exit(1)
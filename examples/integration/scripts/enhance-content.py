@@ -66,6 +66,12 @@ EMOJI_MAPPINGS = {
     'question': '❓',
 }
 
+# Matches any emoji keyword as a whole word in lower-cased text, longest
+# keywords first
+_EMOJI_KEYWORD_RE = re.compile(
+    r'\b(?:' + '|'.join(map(re.escape, sorted(EMOJI_MAPPINGS, key=len, reverse=True))) + r')\b'
+)
+
 # Hashtag suggestions based on content
 HASHTAG_SUGGESTIONS = {
     'development': ['#dev', '#coding', '#programming', '#software'],
@@ -80,6 +86,53 @@ HASHTAG_SUGGESTIONS = {
     'cloud': ['#cloud', '#aws', '#azure', '#gcp', '#cloudcomputing'],
 }
 
+# Technology-specific hashtags based on keywords
+TECH_HASHTAGS = {
+    'python': '#python',
+    'javascript': '#javascript',
+    'react': '#react',
+    'vue': '#vuejs',
+    'angular': '#angular',
+    'node': '#nodejs',
+    'docker': '#docker',
+    'kubernetes': '#k8s',
+    'aws': '#aws',
+    'azure': '#azure',
+    'gcp': '#gcp',
+}
+
+# Sentiment keywords
+POSITIVE_WORDS = frozenset(('great', 'awesome', 'excellent', 'amazing', 'wonderful', 'fantastic', 'love', 'excited'))
+NEGATIVE_WORDS = frozenset(('bad', 'terrible', 'awful', 'hate', 'disappointed', 'frustrated', 'angry'))
+
+# Call-to-action phrases by type
+CALL_TO_ACTIONS = {
+    'engagement': (
+        "What do you think? 💭",
+        "Share your thoughts! 💬",
+        "Let me know in the comments! 👇",
+    ),
+    'sharing': (
+        "Please share if you found this helpful! 🔄",
+        "Tag someone who needs to see this! 👥",
+        "Spread the word! 📢",
+    ),
+    'learning': (
+        "Want to learn more? 📚",
+        "Check out the full tutorial! 🔗",
+        "Follow for more tips! ➡️",
+    ),
+}
+
+# Readability patterns. Once whitespace is collapsed, a sentence end is
+# either followed by a single space (capturing the first character of the
+# next sentence) or glued to a capital letter.
+_WHITESPACE_RE = re.compile(r'\s+')
+_SENTENCE_END_RE = re.compile(r'([.!?])(?: ([^.!?]?)|(?=[A-Z]))')
+
+_HASHTAG_RE = re.compile(r'#\w+', re.IGNORECASE)
+_WORD_RE = re.compile(r'\w+')
+
 def enhance_content(content: str, add_emojis: bool = True, optimize_hashtags: bool = True, 
                    improve_readability: bool = True, max_hashtags: int = 5) -> str:
     """Enhance content with emojis, hashtags, and readability improvements."""
@@ -97,81 +150,76 @@ def enhance_content(content: str, add_emojis: bool = True, optimize_hashtags: bo
     
     return enhanced
 
+def _sentence_end_sub(match):
+    """Space out a sentence end and capitalize the next sentence."""
+    return match.group(1) + ' ' + (match.group(2) or '').upper()
+
 def improve_text_readability(content: str) -> str:
     """Improve text readability with better formatting."""
     
-    # Fix common spacing issues
-    content = re.sub(r'\s+', ' ', content)  # Multiple spaces to single
-    content = re.sub(r'\n\s*\n\s*\n+', '\n\n', content)  # Multiple newlines to double
-    
-    # Add proper spacing around punctuation
-    content = re.sub(r'([.!?])([A-Z])', r'\1 \2', content)
+    # Fix common spacing issues. Newlines are collapsed as well, so a list
+    # marker can only remain at the very start of the text.
+    content = _WHITESPACE_RE.sub(' ', content)
+    if content[:1] in ('-', '*'):
+        return ('• ' + _SENTENCE_END_RE.sub(_sentence_end_sub, content[1:].lstrip(' '))).strip()
     
-    # Improve list formatting
-    content = re.sub(r'^[-*]\s*', '• ', content, flags=re.MULTILINE)
+    # Add missing spaces and capitalize sentences in a single pass
+    content = _SENTENCE_END_RE.sub(_sentence_end_sub, content)
     
-    # Capitalize sentences properly
-    sentences = re.split(r'([.!?]\s+)', content)
-    for i in range(0, len(sentences), 2):
-        if sentences[i]:
-            sentences[i] = sentences[i][0].upper() + sentences[i][1:] if len(sentences[i]) > 1 else sentences[i].upper()
-    content = ''.join(sentences)
-    
-    return content.strip()
+    return (content[:1].upper() + content[1:]).strip()
 
 def add_contextual_emojis(content: str) -> str:
     """Add emojis based on content context."""
     
-    words = content.lower().split()
-    content_lower = content.lower()
+    # Find the first occurrence of every keyword in a single scan. U+0130 is
+    # the only character that grows when lower-cased, so map it to a plain
+    # 'i' first to keep the offsets valid for the original content.
+    first_matches = {}
+    content_lower = content.replace('\u0130', 'i').lower()
+    for match in _EMOJI_KEYWORD_RE.finditer(content_lower):
+        first_matches.setdefault(match.group(), match.end())
     
     # Track which emojis we've already added to avoid duplicates
     added_emojis = set()
+    insertions = []
     
     for word, emoji in EMOJI_MAPPINGS.items():
-        if word in content_lower and emoji not in added_emojis:
-            # Replace the first occurrence of the word with word + emoji
-            pattern = r'\b' + re.escape(word) + r'\b'
-            match = re.search(pattern, content, re.IGNORECASE)
-            if match:
-                original_word = match.group()
-                content = content.replace(original_word, f"{original_word} {emoji}", 1)
-                added_emojis.add(emoji)
-    
-    return content
+        end = first_matches.get(word)
+        if end is not None and emoji not in added_emojis:
+            insertions.append((end, emoji))
+            added_emojis.add(emoji)
+    
+    # Build the result in one pass instead of copying it per insertion
+    parts = []
+    last = 0
+    for end, emoji in sorted(insertions):
+        parts.append(content[last:end])
+        parts.append(f" {emoji}")
+        last = end
+    parts.append(content[last:])
+    
+    return ''.join(parts)
 
 def optimize_hashtags_in_content(content: str, max_hashtags: int) -> str:
     """Optimize hashtags based on content analysis."""
     
     # Extract existing hashtags
-    existing_hashtags = set(re.findall(r'#\w+', content, re.IGNORECASE))
+    existing_hashtags = set(_HASHTAG_RE.findall(content))
     
     # Analyze content for hashtag suggestions
     content_lower = content.lower()
     suggested_hashtags = []
     
+    existing_lower = {h.lower() for h in existing_hashtags}
+    
     for category, hashtags in HASHTAG_SUGGESTIONS.items():
         if category in content_lower:
             for hashtag in hashtags:
-                if hashtag.lower() not in [h.lower() for h in existing_hashtags]:
+                if hashtag.lower() not in existing_lower:
                     suggested_hashtags.append(hashtag)
     
     # Add technology-specific hashtags based on keywords
-    tech_keywords = {
-        'python': '#python',
-        'javascript': '#javascript',
-        'react': '#react',
-        'vue': '#vuejs',
-        'angular': '#angular',
-        'node': '#nodejs',
-        'docker': '#docker',
-        'kubernetes': '#k8s',
-        'aws': '#aws',
-        'azure': '#azure',
-        'gcp': '#gcp',
-    }
-    
-    for keyword, hashtag in tech_keywords.items():
+    for keyword, hashtag in TECH_HASHTAGS.items():
         if keyword in content_lower and hashtag not in existing_hashtags:
             suggested_hashtags.append(hashtag)
     
@@ -193,14 +241,11 @@ def optimize_hashtags_in_content(content: str, max_hashtags: int) -> str:
 def analyze_content_sentiment(content: str) -> str:
     """Analyze content sentiment and suggest appropriate emojis."""
     
-    positive_words = ['great', 'awesome', 'excellent', 'amazing', 'wonderful', 'fantastic', 'love', 'excited']
-    negative_words = ['bad', 'terrible', 'awful', 'hate', 'disappointed', 'frustrated', 'angry']
-    neutral_words = ['update', 'change', 'new', 'announcement', 'information']
-    
-    content_lower = content.lower()
+    # Compare whole words, so 'bad' doesn't match inside 'badge'
+    words = set(_WORD_RE.findall(content.lower()))
     
-    positive_count = sum(1 for word in positive_words if word in content_lower)
-    negative_count = sum(1 for word in negative_words if word in content_lower)
+    positive_count = len(words & POSITIVE_WORDS)
+    negative_count = len(words & NEGATIVE_WORDS)
     
     if positive_count > negative_count:
         return 'positive'
@@ -212,27 +257,9 @@ def analyze_content_sentiment(content: str) -> str:
 def add_call_to_action(content: str, cta_type: str = 'engagement') -> str:
     """Add appropriate call-to-action based on content type."""
     
-    ctas = {
-        'engagement': [
-            "What do you think? 💭",
-            "Share your thoughts! 💬",
-            "Let me know in the comments! 👇",
-        ],
-        'sharing': [
-            "Please share if you found this helpful! 🔄",
-            "Tag someone who needs to see this! 👥",
-            "Spread the word! 📢",
-        ],
-        'learning': [
-            "Want to learn more? 📚",
-            "Check out the full tutorial! 🔗",
-            "Follow for more tips! ➡️",
-        ]
-    }
-    
-    if cta_type in ctas:
+    if cta_type in CALL_TO_ACTIONS:
         import random
-        cta = random.choice(ctas[cta_type])
+        cta = random.choice(CALL_TO_ACTIONS[cta_type])
         content = content.rstrip() + f"\n\n{cta}"
     
     return content
@@ -250,7 +277,7 @@ if __name__ == "__main__":
     args = parser.parse_args()
     
     try:
-        content = sys.stdin.read().strip()
+        content = sys.stdin.buffer.read().decode('utf-8', 'replace').strip()
         if not content:
             logger.error("No input content provided")
             sys.exit(1)
@@ -12,6 +12,11 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+_HASHTAG_RE = re.compile(r'#\w+')
+_URL_RE = re.compile(r'https?://\S+')
+_WHITESPACE_RE = re.compile(r'\s+')
+_SENTENCE_END_RE = re.compile(r'[.!?]+\s+')
+
 def optimize_length(content, max_length, preserve_hashtags=True, preserve_urls=True):
     """Optimize content length while preserving important elements."""
     
@@ -23,15 +28,15 @@ def optimize_length(content, max_length, preserve_hashtags=True, preserve_urls=T
     urls = []
     
     if preserve_hashtags:
-        hashtags = re.findall(r'#\w+', content)
-        content = re.sub(r'#\w+', '', content)
+        hashtags = _HASHTAG_RE.findall(content)
+        content = _HASHTAG_RE.sub('', content)
     
     if preserve_urls:
-        urls = re.findall(r'https?://\S+', content)
-        content = re.sub(r'https?://\S+', '[URL]', content)
+        urls = _URL_RE.findall(content)
+        content = _URL_RE.sub('[URL]', content)
     
     # Clean up extra whitespace
-    content = re.sub(r'\s+', ' ', content).strip()
+    content = _WHITESPACE_RE.sub(' ', content).strip()
     
     # Calculate space needed for preserved elements
     preserved_length = 0
@@ -75,50 +80,34 @@ def optimize_length(content, max_length, preserve_hashtags=True, preserve_urls=T
 
 def truncate_at_sentence(content, max_length):
     """Truncate at sentence boundaries."""
-    sentences = re.split(r'[.!?]+\s+', content)
-    optimized = ""
-    
-    for sentence in sentences:
-        test_length = len(optimized + sentence + '. ')
-        if test_length <= max_length:
-            optimized += sentence + '. '
-        else:
-            break
-    
-    if optimized and len(optimized.strip()) > 10:  # Minimum meaningful length
-        return optimized.strip() + "..."
-    return None
+    sentences = _SENTENCE_END_RE.split(content)
+    return join_leading_parts(sentences, '. ', max_length)
 
 def truncate_at_paragraph(content, max_length):
     """Truncate at paragraph boundaries."""
     paragraphs = content.split('\n\n')
-    optimized = ""
-    
-    for paragraph in paragraphs:
-        test_length = len(optimized + paragraph + '\n\n')
-        if test_length <= max_length:
-            optimized += paragraph + '\n\n'
-        else:
-            break
-    
-    if optimized and len(optimized.strip()) > 10:
-        return optimized.strip() + "..."
-    return None
+    return join_leading_parts(paragraphs, '\n\n', max_length)
 
 def truncate_at_word(content, max_length):
     """Truncate at word boundaries."""
     words = content.split()
-    optimized = ""
-    
-    for word in words:
-        test_length = len(optimized + word + ' ')
-        if test_length <= max_length:
-            optimized += word + ' '
-        else:
+    return join_leading_parts(words, ' ', max_length)
+
+def join_leading_parts(parts, separator, max_length):
+    """Join as many leading parts as fit, each followed by separator."""
+    kept = []
+    length = 0
+    
+    # Track the length instead of building and measuring the string each time
+    for part in parts:
+        length += len(part) + len(separator)
+        if length > max_length:
             break
+        kept.append(part)
     
-    if optimized and len(optimized.strip()) > 10:
-        return optimized.strip() + "..."
+    optimized = (separator.join(kept) + separator).strip() if kept else ''
+    if len(optimized) > 10:  # Minimum meaningful length
+        return optimized + "..."
     return None
 
 def get_platform_limits():
@@ -147,7 +136,7 @@ if __name__ == "__main__":
         args.max_length = get_platform_limits()[args.platform]
     
     try:
-        content = sys.stdin.read().strip()
+        content = sys.stdin.buffer.read().decode('utf-8', 'replace').strip()
         if not content:
             logger.error("No input content provided")
             sys.exit(1)
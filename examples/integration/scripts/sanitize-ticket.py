@@ -9,19 +9,45 @@ import json
 import re
 import logging
 
+try:
+    # RE2 matches in linear time, so crafted ticket text cannot make the
+    # redaction patterns backtrack. Fall back to the stdlib when missing.
+    import re2 as re_fast
+except ImportError:
+    re_fast = re
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Sensitive patterns, compiled once and applied one after another in this
+# order. Each pass sees the output of the previous ones, which decides
+# what is redacted where matches touch or overlap.
+_EMAIL_RE = re_fast.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+_SENSITIVE_RES = (
+    (re_fast.compile(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b'), '[PHONE]'),
+    (re_fast.compile(r'\b\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}\b'), '[IP]'),
+    (re_fast.compile(r'\b\d{4}[-\s]?\d{4}[-\s]?\d{4}[-\s]?\d{4}\b'), '[CARD]'),
+    (re_fast.compile(r'\b\d{3}-\d{2}-\d{4}\b'), '[SSN]'),
+)
+
+# URLs run last so that card numbers reaching into a URL are redacted first
+_URL_RE = re_fast.compile(r'https?://([^/\s]+)[^\s]*')
+
+_TICKET_ID_RE = re.compile(r'#?(\d{4,})')
+
 def sanitize_ticket(content):
     """Sanitize support ticket data for social media posting."""
     try:
-        # Try to parse as JSON first
-        try:
-            data = json.loads(content)
-            return sanitize_json_ticket(data)
-        except json.JSONDecodeError:
-            # If not JSON, treat as plain text
-            return sanitize_text_ticket(content)
+        # Try to parse as JSON first, only objects can be tickets
+        if content.startswith('{'):
+            try:
+                data = json.loads(content)
+                return sanitize_json_ticket(data)
+            except json.JSONDecodeError:
+                pass
+        
+        # If not JSON, treat as plain text
+        return sanitize_text_ticket(content)
             
     except Exception as e:
         logger.error(f"Error sanitizing ticket: {e}")
@@ -69,7 +95,7 @@ def sanitize_text_ticket(content):
     content = remove_sensitive_info(content)
     
     # Extract ticket ID if present
-    ticket_match = re.search(r'#?(\d{4,})', content)
+    ticket_match = _TICKET_ID_RE.search(content)
     ticket_id = ticket_match.group(1) if ticket_match else 'Unknown'
     
     # Truncate if too long
@@ -80,29 +106,21 @@ def sanitize_text_ticket(content):
 
 def remove_sensitive_info(text):
     """Remove sensitive information from text."""
-    # Remove email addresses
-    text = re.sub(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', '[EMAIL]', text)
+    # Remove email addresses, they can't occur without an '@'
+    if '@' in text:
+        text = _EMAIL_RE.sub('[EMAIL]', text)
     
-    # Remove phone numbers
-    text = re.sub(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b', '[PHONE]', text)
-    
-    # Remove IP addresses
-    text = re.sub(r'\b\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}\b', '[IP]', text)
-    
-    # Remove credit card patterns
-    text = re.sub(r'\b\d{4}[-\s]?\d{4}[-\s]?\d{4}[-\s]?\d{4}\b', '[CARD]', text)
-    
-    # Remove social security numbers
-    text = re.sub(r'\b\d{3}-\d{2}-\d{4}\b', '[SSN]', text)
+    # Remove phone numbers, IP addresses, credit card patterns and
+    # social security numbers
+    for pattern, tag in _SENSITIVE_RES:
+        text = pattern.sub(tag, text)
     
     # Remove URLs (keep domain for context)
-    text = re.sub(r'https?://([^/\s]+)[^\s]*', r'[URL: \1]', text)
-    
-    return text
+    return _URL_RE.sub(r'[URL: \1]', text)
 
 if __name__ == "__main__":
     try:
-        content = sys.stdin.read().strip()
+        content = sys.stdin.buffer.read().decode('utf-8', 'replace').strip()
         if not content:
             logger.error("No input content provided")
             sys.exit(1)